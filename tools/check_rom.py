@@ -9,51 +9,261 @@ This script is intentionally lightweight and is meant to catch the most common
 build mistakes quickly:
 - wrong ROM size
 - obviously-wrong reset vector
+
+Batch mode (several ROMs, a directory of ROMs, `--jobs`, or `--json`) also runs
+deeper per-bank F6 checks and prints one JSON object per ROM:
+- the $FFE0 bankcall stubs are byte-identical across the banks that share them
+- IRQ/BRK vectors point into ROM (NMI is reported only; the 6507 has no NMI pin)
+- nothing is assembled over the F6 hotspots $FFF6-$FFF9 in any bank
+- no bank is empty (only fill bytes besides its vectors)
+
+Batch validation runs across a process pool and reads ROMs through mmap, so a
+release can validate hundreds of build variants in one invocation.
 """
 
+from __future__ import annotations
+
 import argparse
 import hashlib
+import json
+import mmap
+import os
 import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 
+ROM_SIZE = 16 * 1024
+BANK_SIZE = 0x1000
+BANK_COUNT = ROM_SIZE // BANK_SIZE
 
-def main() -> int:
-    """CLI entrypoint. Exits 0 on success, raises SystemExit on failure."""
-    ap = argparse.ArgumentParser(description="Sanity-check the built Atari 2600 ROM.")
-    ap.add_argument("rom", type=Path, nargs="?", default=Path("build/mecha.bin"))
-    args = ap.parse_args()
+# Runtime addresses (every bank is mapped at $F000-$FFFF).
+STUB_START = 0xFFE0      # banked-call stub region (see `CallBuildPauseMap` in mecha.asm)
+HOTSPOT_START = 0xFFF6   # F6 hotspots: BANK0..BANK3 = $FFF6..$FFF9
+HOTSPOT_END = 0xFFF9
+NMI_VECTOR = 0xFFFA
+RESET_VECTOR = 0xFFFC
+IRQ_VECTOR = 0xFFFE
 
-    rom_path: Path = args.rom
-    if not rom_path.exists():
-        raise SystemExit(f"ERROR: ROM file not found: {rom_path}")
-    data = rom_path.read_bytes()
+# DASM fills ORG gaps with $00 (or $FF when the ROM was padded by another tool).
+FILL_BYTES = (0x00, 0xFF)
+
+# Banks whose $FFE0 stubs must be identical: bank3 switches to bank2 mid-stub and
+# bank2 switches back, so the CPU keeps fetching the same bytes across the switch.
+DEFAULT_STUB_BANKS = (2, 3)
+
+
+@dataclass
+class RomReport:
+    rom: str
+    ok: bool = True
+    size: int = 0
+    sha1: str = ""
+    reset_vectors: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+    def error(self, msg: str) -> None:
+        self.ok = False
+        self.errors.append(msg)
+
+
+def _bank_offset(bank: int, addr: int) -> int:
+    """File offset of runtime address `addr` ($F000-$FFFF) inside `bank`."""
+    return bank * BANK_SIZE + (addr & 0x0FFF)
+
+
+def _read_vector(data: bytes | mmap.mmap, bank: int, addr: int) -> int:
+    lo, hi = struct.unpack_from("<BB", data, _bank_offset(bank, addr))
+    return lo | (hi << 8)
+
+
+def _is_rom_address(addr: int) -> bool:
+    # Note: on the 6507, ROM appears mirrored into $F000-$FFFF.
+    return 0xF000 <= addr <= 0xFFFF
+
+
+def _check_stubs(data: bytes | mmap.mmap, report: RomReport, stub_banks: tuple[int, ...]) -> None:
+    """Stub bytes must match up to (not including) the hotspots in every sharing bank."""
+    if len(stub_banks) < 2:
+        return
+    stubs = {
+        bank: bytes(data[_bank_offset(bank, STUB_START) : _bank_offset(bank, HOTSPOT_START)])
+        for bank in stub_banks
+    }
+    ref_bank = stub_banks[0]
+    ref = stubs[ref_bank]
+    if all(b in FILL_BYTES for b in ref):
+        report.error(f"bank{ref_bank} has no bankcall stub at ${STUB_START:04X}")
+    for bank in stub_banks[1:]:
+        if stubs[bank] != ref:
+            diff = next(i for i, (a, b) in enumerate(zip(ref, stubs[bank])) if a != b)
+            report.error(
+                f"bankcall stub differs between bank{ref_bank} and bank{bank} "
+                f"at ${STUB_START + diff:04X} (${ref[diff]:02X} vs ${stubs[bank][diff]:02X})"
+            )
+
+
+def _check_reset(data: bytes | mmap.mmap, report: RomReport, bank: int) -> int:
+    reset = _read_vector(data, bank, RESET_VECTOR)
+    report.reset_vectors.append(f"${reset:04X}")
+    if not _is_rom_address(reset):
+        report.error(
+            f"bank{bank} reset vector doesn't look like a 6507 ROM address ($F000-$FFFF): ${reset:04X}"
+        )
+    return reset
+
+
+def _check_bank(data: bytes | mmap.mmap, report: RomReport, bank: int, allow_empty: tuple[int, ...]) -> None:
+    reset = _check_reset(data, report, bank)
+    if reset >= HOTSPOT_START:
+        report.error(f"bank{bank} reset vector points into the hotspot/vector area: ${reset:04X}")
+    elif _is_rom_address(reset) and data[_bank_offset(bank, reset)] in FILL_BYTES:
+        report.warnings.append(f"bank{bank} reset vector ${reset:04X} points at a fill byte")
 
-    print(f"ROM: {rom_path} ({len(data)} bytes)")
+    # The 6507 has no IRQ/NMI pins, but BRK still jumps through $FFFE.
+    irq = _read_vector(data, bank, IRQ_VECTOR)
+    if not _is_rom_address(irq) or irq >= HOTSPOT_START:
+        report.error(f"bank{bank} IRQ/BRK vector doesn't point into ROM code: ${irq:04X}")
+    nmi = _read_vector(data, bank, NMI_VECTOR)
+    if nmi not in (0x0000, 0xFFFF) and not _is_rom_address(nmi):
+        report.warnings.append(f"bank{bank} NMI vector is neither fill nor a ROM address: ${nmi:04X}")
 
-    if len(data) != 16 * 1024:
-        raise SystemExit(f"ERROR: Expected 16384 bytes (16K F6), got {len(data)}")
+    # Any byte at the hotspots means code/data was assembled over them; executing
+    # or reading it would bankswitch mid-instruction.
+    hot = bytes(data[_bank_offset(bank, HOTSPOT_START) : _bank_offset(bank, HOTSPOT_END) + 1])
+    if len(set(hot)) != 1 or hot[0] not in FILL_BYTES:
+        report.error(
+            f"bank{bank} has code/data over the F6 hotspots ${HOTSPOT_START:04X}-${HOTSPOT_END:04X}: "
+            + " ".join(f"${b:02X}" for b in hot)
+        )
 
-    sha1 = hashlib.sha1(data).hexdigest()
-    print(f"SHA1: {sha1}")
+    body = data[bank * BANK_SIZE : _bank_offset(bank, NMI_VECTOR)]
+    if bank not in allow_empty and any(body.count(b) == len(body) for b in FILL_BYTES):
+        report.error(f"bank{bank} is empty (only ${body[0]:02X} fill before the vectors)")
+
+
+def check_rom(
+    rom_path: Path,
+    deep: bool = False,
+    stub_banks: tuple[int, ...] = DEFAULT_STUB_BANKS,
+    allow_empty: tuple[int, ...] = (),
+) -> RomReport:
+    """
+    Validate one ROM file and return a report (never raises for a bad ROM).
+
+    The file is mapped rather than read so large batches don't copy every ROM
+    into each worker process.
+    """
+    report = RomReport(rom=str(rom_path))
+    try:
+        with open(rom_path, "rb") as f:
+            report.size = os.fstat(f.fileno()).st_size
+            if report.size == 0:
+                report.error(f"Expected {ROM_SIZE} bytes (16K F6), got 0")
+                return report
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                report.sha1 = hashlib.sha1(data).hexdigest()
+                if report.size != ROM_SIZE:
+                    report.error(f"Expected {ROM_SIZE} bytes (16K F6), got {report.size}")
+                    return report
+                for bank in range(BANK_COUNT):
+                    if deep:
+                        _check_bank(data, report, bank, allow_empty)
+                    else:
+                        _check_reset(data, report, bank)
+                if deep:
+                    _check_stubs(data, report, stub_banks)
+    except FileNotFoundError:
+        report.error(f"ROM file not found: {rom_path}")
+    except OSError as e:
+        report.error(f"cannot read ROM: {e}")
+    return report
+
+
+def _expand_roms(paths: list[Path]) -> list[Path]:
+    """Directories expand to the `*.bin` files they contain (sorted, non-recursive)."""
+    roms: list[Path] = []
+    for p in paths:
+        if p.is_dir():
+            roms.extend(sorted(p.glob("*.bin")))
+        else:
+            roms.append(p)
+    return roms
+
+
+def _parse_banks(text: str) -> tuple[int, ...]:
+    if not text:
+        return ()
+    banks = tuple(int(b) for b in text.split(","))
+    if any(not 0 <= b < BANK_COUNT for b in banks):
+        raise argparse.ArgumentTypeError(f"bank numbers must be 0..{BANK_COUNT - 1}: {text}")
+    return banks
+
+
+def _parse_jobs(text: str) -> int:
+    jobs = int(text)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0 (0 = CPU count): {text}")
+    return jobs
+
+
+def _check_single(rom_path: Path) -> int:
+    """Original single-ROM human-readable output."""
+    if not rom_path.exists():
+        raise SystemExit(f"ERROR: ROM file not found: {rom_path}")
+    report = check_rom(rom_path)
+
+    print(f"ROM: {rom_path} ({report.size} bytes)")
+    if report.size != ROM_SIZE:
+        raise SystemExit(f"ERROR: {report.errors[0]}")
+    print(f"SHA1: {report.sha1}")
 
     # F6 carts contain 4 independent 4K banks. Each bank has vectors at its end.
     # Depending on the bankswitch hardware/emulator behavior, reset may start in bank 0.
     # We print all reset vectors so it's obvious what will happen on startup.
-    for bank in range(4):
-        off = bank * 0x1000 + 0x0FFC
-        reset_lo, reset_hi = struct.unpack_from("<BB", data, off)
-        reset = reset_lo | (reset_hi << 8)
-        print(f"Reset vector bank{bank} @0x{off:04X}: ${reset:04X}")
-
-        # Note: on the 6507, ROM appears mirrored into $F000-$FFFF.
-        if not (0xF000 <= reset <= 0xFFFF):
-            raise SystemExit(
-                f"ERROR: bank{bank} reset vector doesn't look like a 6507 ROM address ($F000-$FFFF): ${reset:04X}"
-            )
+    for bank, reset in enumerate(report.reset_vectors):
+        off = bank * BANK_SIZE + 0x0FFC
+        print(f"Reset vector bank{bank} @0x{off:04X}: {reset}")
+    if report.errors:
+        raise SystemExit(f"ERROR: {report.errors[0]}")
 
     return 0
 
 
+def main() -> int:
+    """CLI entrypoint. Exits 0 on success, raises SystemExit on failure."""
+    ap = argparse.ArgumentParser(description="Sanity-check the built Atari 2600 ROM.")
+    ap.add_argument("roms", type=Path, nargs="*", default=[Path("build/mecha.bin")],
+                    help="ROM files or directories of *.bin (default: build/mecha.bin)")
+    ap.add_argument("--json", action="store_true", help="deep checks, one JSON object per ROM")
+    ap.add_argument("-j", "--jobs", type=_parse_jobs, default=0,
+                    help="worker processes for batch mode (default: CPU count)")
+    ap.add_argument("--stub-banks", type=_parse_banks, default=DEFAULT_STUB_BANKS,
+                    help="comma-separated banks whose $FFE0 stubs must match (default: 2,3)")
+    ap.add_argument("--allow-empty", type=_parse_banks, default=(),
+                    help="comma-separated banks that may legitimately be empty")
+    args = ap.parse_args()
+
+    roms = _expand_roms(args.roms)
+    if len(roms) == 1 and not args.json and not args.jobs and not args.roms[0].is_dir():
+        return _check_single(roms[0])
+    if not roms:
+        raise SystemExit("ERROR: no ROMs to check")
+
+    jobs = args.jobs or os.cpu_count() or 1
+    failed = 0
+    with ProcessPoolExecutor(max_workers=min(jobs, len(roms))) as pool:
+        futures = [
+            pool.submit(check_rom, rom, True, args.stub_banks, args.allow_empty) for rom in roms
+        ]
+        for fut in futures:
+            report = fut.result()
+            failed += not report.ok
+            print(json.dumps(asdict(report)), flush=True)
+
+    return 1 if failed else 0
+
+
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -10,10 +10,24 @@ Why generate tables?
 Output:
 - Writes `src/include/generated_tables.inc`
   (included into the ROM, typically in bank3 with the visible kernel).
+- With `--compass-variant dotrow|frame`, also writes precomputed compass strip
+  tables to `src/include/generated_compass_tables.inc`; `--compass-report`
+  prints the ROM bytes each variant costs against the VBLANK cycles it saves.
+
+`--watch` keeps running, polls this script for edits and regenerates only the
+table families whose generator changed, rewriting only include files whose
+bytes changed (see `watch()`).
 """
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import importlib.util
+import sys
+import time
+import types
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -480,6 +494,195 @@ def gen_map_column_masks() -> dict[str, list[int]]:
     return out
 
 
+# --------------------
+# Compass strip variants (ROM vs VBLANK trade-off)
+# --------------------
+
+# Mirrors `DotReg` / `DotMask` in mecha.asm (bank3): for dotIdx 0..7, which of the six
+# 8-byte PF row groups (0=PF0L .. 5=PF2R) gets the legs-dot, and the OR mask.
+DOT_REG = [0, 1, 1, 2, 3, 4, 4, 5]
+DOT_MASK = [0x30, 0x60, 0x03, 0x18, 0x30, 0x60, 0x03, 0x18]
+DOT_ROWS = (6, 7)
+COMPASS_ROWS = 8
+PF_REGS = ("PF0L", "PF1L", "PF2L", "PF0R", "PF1R", "PF2R")
+# Cycle count of the current compass build in GameLogic, hand-counted from mecha.asm.
+# The `copy` variant's model must reproduce it; update both together.
+COPY_BASELINE_CYCLES = 615
+
+# (cycles, bytes) per addressing mode on the 6507, assuming no page crossings.
+# Indexed stores to absolute addresses always take the extra cycle.
+_MODE_COST = {
+    "imp": (2, 1),
+    "imm": (2, 2),
+    "zp": (3, 2),
+    "zp,x": (4, 2),
+    "abs": (4, 3),
+    "abs,x": (4, 3),
+    "abs,y": (4, 3),
+    "ind": (5, 3),
+}
+
+Op = tuple[str, str]
+
+
+def _seq_cost(ops: list[Op]) -> tuple[int, int]:
+    """(cycles, bytes) of straight-line code. Branches are costed by `_loop_cost`."""
+    cycles = 0
+    size = 0
+    for mnemonic, mode in ops:
+        c, b = _MODE_COST[mode]
+        if mnemonic.startswith("st") and mode in ("abs,x", "abs,y"):
+            c += 1
+        if mnemonic == "jmp" and mode == "abs":
+            c -= 1  # jmp abs = 3; jmp (ind) keeps the "ind" cost of 5
+        cycles += c
+        size += b
+    return cycles, size
+
+
+def _loop_cost(body: list[Op], iterations: int) -> tuple[int, int]:
+    """Body + closing `bne`: taken (3) on every pass but the last (2)."""
+    c, b = _seq_cost(body)
+    return iterations * (c + 3) - 1, b + 2
+
+
+@dataclass(frozen=True)
+class CompassVariant:
+    name: str
+    description: str
+    tables: dict[str, list[int]]
+    vblank_cycles: int
+    code_bytes: int
+    helper_bytes: int  # small ROM tables the code needs besides `tables`
+
+    @property
+    def rom_bytes(self) -> int:
+        return sum(len(v) for v in self.tables.values()) + self.code_bytes + self.helper_bytes
+
+
+def compose_compass_frame(strip: PFTable, view: int, dot_idx: int) -> list[list[int]]:
+    """
+    The 48-byte MapPF* block GameLogic builds for (ViewDir, dotIdx): 6 registers x 8 rows.
+
+    Same steps as the asm: copy the strip rows for `view`, then OR the legs-dot into rows 6/7.
+    """
+    regs = [strip.pf0l, strip.pf1l, strip.pf2l, strip.pf0r, strip.pf1r, strip.pf2r]
+    frame = [list(t[view * COMPASS_ROWS : (view + 1) * COMPASS_ROWS]) for t in regs]
+    for row in DOT_ROWS:
+        frame[DOT_REG[dot_idx]][row] |= DOT_MASK[dot_idx]
+    return frame
+
+
+# Code shared by the variants (see the "Build compass strip" block in GameLogic).
+_VIEW_X8 = [("lda", "zp"), ("asl", "imp"), ("asl", "imp"), ("asl", "imp"), ("tax", "imp")]
+_DOT_IDX = [("lda", "zp"), ("sec", "imp"), ("sbc", "zp"), ("clc", "imp"), ("adc", "imm"), ("and", "imm")]
+_COPY_ROW = [("lda", "abs,x"), ("sta", "abs,y")] * 6 + [("inx", "imp"), ("iny", "imp"), ("cpy", "imm")]
+_PRELOAD = [("lda", "zp"), ("sta", "zp")] * 6
+
+
+def _cost(*parts: tuple[int, int]) -> tuple[int, int]:
+    return sum(p[0] for p in parts), sum(p[1] for p in parts)
+
+
+def gen_compass_variants(strip: PFTable) -> dict[str, CompassVariant]:
+    """
+    Ways to build the per-frame compass block, from "all at runtime" to "all in ROM".
+
+    - copy:   current code. Copy 8 rows for ViewDir, OR the dot via DotReg/DotMask, preload row 0.
+    - dotrow: copy only the rows above the dot, then store precomputed dot rows.
+              If the strip's dot rows don't depend on ViewDir (blank under the glyphs),
+              the tables collapse to one entry per dotIdx.
+    - frame:  every (ViewDir, dotIdx) frame precomputed; dispatch on dotIdx through a
+              pointer table (in Tmp0/Tmp1) to one of 8 unrolled copies of the copy loop.
+
+    Each variant is checked against `compose_compass_frame` for all 64 combinations.
+    """
+    views = range(8)
+    dots = range(8)
+    expected = {(v, d): compose_compass_frame(strip, v, d) for v in views for d in dots}
+    variants: dict[str, CompassVariant] = {}
+
+    # -- copy (baseline) --
+    dot_inject = [
+        ("lda", "abs,x"), ("sta", "zp"), ("lda", "abs,x"),
+        ("asl", "imp"), ("asl", "imp"), ("asl", "imp"), ("clc", "imp"), ("adc", "imm"), ("tax", "imp"),
+        ("lda", "zp,x"), ("ora", "zp"), ("sta", "zp,x"), ("inx", "imp"),
+        ("lda", "zp,x"), ("ora", "zp"), ("sta", "zp,x"),
+    ]
+    cycles, size = _cost(
+        _seq_cost(_VIEW_X8 + [("ldy", "imm")]),
+        _loop_cost(_COPY_ROW, COMPASS_ROWS),
+        _seq_cost(_DOT_IDX + [("tax", "imp")] + dot_inject),
+        _seq_cost(_PRELOAD),
+    )
+    assert cycles == COPY_BASELINE_CYCLES, f"copy model costs {cycles} cycles, asm is {COPY_BASELINE_CYCLES}"
+    variants["copy"] = CompassVariant(
+        "copy", "copy 8 rows + OR legs-dot at runtime (current)", {}, cycles, size, len(DOT_REG) + len(DOT_MASK)
+    )
+
+    # -- dotrow --
+    first_dot = min(DOT_ROWS)
+    view_independent = all(
+        expected[(v, d)][r][row] == expected[(0, d)][r][row]
+        for v in views for d in dots for r in range(6) for row in DOT_ROWS
+    )
+    keys = [(0, d) for d in dots] if view_independent else [(v, d) for v in views for d in dots]
+    dotrow_tables = {f"CompassDot{reg}": [expected[k][r][first_dot] for k in keys] for r, reg in enumerate(PF_REGS)}
+    for (v, d), frame in expected.items():
+        idx = d if view_independent else v * 8 + d
+        for r, reg in enumerate(PF_REGS):
+            assert all(frame[r][row] == dotrow_tables[f"CompassDot{reg}"][idx] for row in DOT_ROWS)
+    index = _DOT_IDX + ([] if view_independent else [("ora", "zp")]) + [("tax", "imp")]
+    store_dot = [("lda", "abs,x")] + [("sta", "zp")] * len(DOT_ROWS)
+    cycles, size = _cost(
+        _seq_cost(_VIEW_X8 + [("ldy", "imm")] + ([] if view_independent else [("stx", "zp")])),
+        _loop_cost(_COPY_ROW, first_dot),
+        _seq_cost(index + store_dot * 6),
+        _seq_cost(_PRELOAD),
+    )
+    keyed = "dotIdx" if view_independent else "ViewDir*8+dotIdx"
+    variants["dotrow"] = CompassVariant(
+        "dotrow", f"copy rows 0-{first_dot - 1}, store dot rows from tables keyed by {keyed}",
+        dotrow_tables, cycles, size, 0,
+    )
+
+    # -- frame --
+    frame_tables: dict[str, list[int]] = {}
+    for d in dots:
+        for r, reg in enumerate(PF_REGS):
+            frame_tables[f"CompassFrame{d}{reg}"] = [
+                expected[(v, d)][r][row] for v in views for row in range(COMPASS_ROWS)
+            ]
+    dispatch = _DOT_IDX + [("asl", "imp"), ("tax", "imp"),
+                           ("lda", "abs,x"), ("sta", "zp"), ("lda", "abs,x"), ("sta", "zp"), ("jmp", "ind")]
+    one_copy = _cost(_seq_cost(_VIEW_X8 + [("ldy", "imm")]), _loop_cost(_COPY_ROW, COMPASS_ROWS),
+                     _seq_cost([("jmp", "abs")]))
+    cycles = _seq_cost(dispatch)[0] + one_copy[0] + _seq_cost(_PRELOAD)[0]
+    size = _seq_cost(dispatch)[1] + len(dots) * one_copy[1] + _seq_cost(_PRELOAD)[1]
+    variants["frame"] = CompassVariant(
+        "frame", "whole 8-row frame per (ViewDir, dotIdx); dispatch on dotIdx",
+        frame_tables, cycles, size, 2 * len(dots),
+    )
+
+    return variants
+
+
+def format_compass_report(variants: dict[str, CompassVariant]) -> str:
+    """ROM bytes spent vs VBLANK cycles saved, relative to the current `copy` code."""
+    base = variants["copy"]
+    lines = [
+        "Compass strip build (per frame, VBLANK; no page crossings assumed):",
+        f"  {'variant':8} {'ROM':>6} {'+ROM':>6} {'cycles':>7} {'saved':>6} {'lines':>6}  description",
+    ]
+    for v in variants.values():
+        saved = base.vblank_cycles - v.vblank_cycles
+        lines.append(
+            f"  {v.name:8} {v.rom_bytes:6d} {v.rom_bytes - base.rom_bytes:+6d} {v.vblank_cycles:7d} "
+            f"{saved:6d} {saved / 76:6.2f}  {v.description}"
+        )
+    return "\n".join(lines)
+
+
 def _emit_tables(lines: list[str], name: str, values: list[int]) -> None:
     """Emit a `.byte` table with nice wrapping for DASM include files."""
     lines.append(f"{name}:")
@@ -489,98 +692,291 @@ def _emit_tables(lines: list[str], name: str, values: list[int]) -> None:
     lines.append("")
 
 
-def write_kernel_inc(path: Path) -> None:
-    """
-    Tables required by the visible kernel (bank3).
+def _emit_pf_table(lines: list[str], prefix: str, table: PFTable) -> None:
+    _emit_tables(lines, f"{prefix}PF0L", table.pf0l)
+    _emit_tables(lines, f"{prefix}PF1L", table.pf1l)
+    _emit_tables(lines, f"{prefix}PF2L", table.pf2l)
+    _emit_tables(lines, f"{prefix}PF0R", table.pf0r)
+    _emit_tables(lines, f"{prefix}PF1R", table.pf1r)
+    _emit_tables(lines, f"{prefix}PF2R", table.pf2r)
 
-    Keep this include file as small as possible so bank3 has room for:
-    - the visible kernel
-    - vectors + bankcall stubs near the end of ROM
-    """
-    bar = gen_bar_tables()
-    compass_strip = gen_compass_strip_tables()
-    gear_ui = gen_gear_ui_tables()
-    overlay = gen_view_overlay_tables()
-    horizon = gen_horizon_tables()
 
-    lines: list[str] = []
-    lines.append("; AUTO-GENERATED by tools/gen_tables.py - DO NOT EDIT BY HAND")
-    lines.append("; Kernel tables (required during visible scanlines).")
-    lines.append("; Playfield bit ordering verified from alienbill playfield diagram.")
-    lines.append("")
+def _emit_table_dict(lines: list[str], tables: dict[str, list[int]]) -> None:
+    for k, v in tables.items():
+        _emit_tables(lines, k, v)
 
+
+# --------------------
+# Table families
+# --------------------
+# Each family is one generator rendered as a section of one include file, so
+# `--watch` can regenerate and time families independently.
+
+# Tables required by the visible kernel (bank3).
+# Keep this include file as small as possible so bank3 has room for:
+# - the visible kernel
+# - vectors + bankcall stubs near the end of ROM
+KERNEL_INC = "generated_kernel_tables.inc"
+# Tables only needed while the game is paused (built during overscan).
+# These are intentionally kept out of bank3 so the visible-kernel bank stays small.
+PAUSE_INC = "generated_pause_tables.inc"
+# Precomputed compass strip tables for `--compass-variant`. Not included by mecha.asm
+# automatically: include it in bank3 next to the kernel tables and replace the
+# compass build in GameLogic with the matching code.
+COMPASS_INC = "generated_compass_tables.inc"
+
+INC_HEADERS: dict[str, list[str]] = {
+    KERNEL_INC: [
+        "; AUTO-GENERATED by tools/gen_tables.py - DO NOT EDIT BY HAND",
+        "; Kernel tables (required during visible scanlines).",
+        "; Playfield bit ordering verified from alienbill playfield diagram.",
+        "",
+    ],
+    PAUSE_INC: [
+        "; AUTO-GENERATED by tools/gen_tables.py - DO NOT EDIT BY HAND",
+        "; Pause/map tables (NOT used by the visible kernel).",
+        "; Playfield bit ordering verified from alienbill playfield diagram.",
+        "",
+    ],
+    COMPASS_INC: [
+        "; AUTO-GENERATED by tools/gen_tables.py - DO NOT EDIT BY HAND",
+    ],
+}
+
+
+@dataclass(frozen=True)
+class TableFamily:
+    name: str
+    include: str
+    build: Callable[[], list[str]]  # include-file lines for this family
+
+
+def _section_bar() -> list[str]:
     # Bars (0..16 segments)
-    _emit_tables(lines, "BarPF0L", bar.pf0l)
-    _emit_tables(lines, "BarPF1L", bar.pf1l)
-    _emit_tables(lines, "BarPF2L", bar.pf2l)
-    _emit_tables(lines, "BarPF0R", bar.pf0r)
-    _emit_tables(lines, "BarPF1R", bar.pf1r)
-    _emit_tables(lines, "BarPF2R", bar.pf2r)
+    lines: list[str] = []
+    _emit_pf_table(lines, "Bar", gen_bar_tables())
+    return lines
+
 
+def _section_compass_strip() -> list[str]:
     # Compass strip (8 dirs * 8 lines)
-    _emit_tables(lines, "CompassStripPF0L", compass_strip.pf0l)
-    _emit_tables(lines, "CompassStripPF1L", compass_strip.pf1l)
-    _emit_tables(lines, "CompassStripPF2L", compass_strip.pf2l)
-    _emit_tables(lines, "CompassStripPF0R", compass_strip.pf0r)
-    _emit_tables(lines, "CompassStripPF1R", compass_strip.pf1r)
-    _emit_tables(lines, "CompassStripPF2R", compass_strip.pf2r)
+    lines: list[str] = []
+    _emit_pf_table(lines, "CompassStrip", gen_compass_strip_tables())
+    return lines
+
 
+def _section_gear_ui() -> list[str]:
     # Gear UI strip (6 gears * 5 lines)
-    _emit_tables(lines, "GearUIPF0L", gear_ui.pf0l)
-    _emit_tables(lines, "GearUIPF1L", gear_ui.pf1l)
-    _emit_tables(lines, "GearUIPF2L", gear_ui.pf2l)
-    _emit_tables(lines, "GearUIPF0R", gear_ui.pf0r)
-    _emit_tables(lines, "GearUIPF1R", gear_ui.pf1r)
-    _emit_tables(lines, "GearUIPF2R", gear_ui.pf2r)
+    lines: list[str] = []
+    _emit_pf_table(lines, "GearUI", gen_gear_ui_tables())
+    return lines
+
 
+def _section_overlay() -> list[str]:
     # View overlay (tank_idx 0..4 plus none=5) * 8 lines
-    for k, v in overlay.items():
-        _emit_tables(lines, k, v)
+    lines: list[str] = []
+    _emit_table_dict(lines, gen_view_overlay_tables())
+    return lines
 
+
+def _section_horizon() -> list[str]:
     # Horizon band (32 steps)
-    _emit_tables(lines, "HorizonPF0L", horizon.pf0l)
-    _emit_tables(lines, "HorizonPF1L", horizon.pf1l)
-    _emit_tables(lines, "HorizonPF2L", horizon.pf2l)
-    _emit_tables(lines, "HorizonPF0R", horizon.pf0r)
-    _emit_tables(lines, "HorizonPF1R", horizon.pf1r)
-    _emit_tables(lines, "HorizonPF2R", horizon.pf2r)
+    lines: list[str] = []
+    _emit_pf_table(lines, "Horizon", gen_horizon_tables())
+    return lines
 
-    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
 
+def _section_map_masks() -> list[str]:
+    lines: list[str] = []
+    _emit_table_dict(lines, gen_map_column_masks())
+    return lines
 
-def write_pause_inc(path: Path) -> None:
-    """
-    Tables only needed while the game is paused (built during overscan).
 
-    These are intentionally kept out of bank3 so the visible-kernel bank stays small.
-    """
-    map_masks = gen_map_column_masks()
+def _section_compass_variant(name: str) -> list[str]:
+    variant = gen_compass_variants(gen_compass_strip_tables())[name]
+    lines = [
+        f"; Compass strip variant `{variant.name}`: {variant.description}.",
+        f"; {variant.rom_bytes} ROM bytes incl. code, ~{variant.vblank_cycles} VBLANK cycles per frame.",
+        "",
+    ]
+    _emit_table_dict(lines, variant.tables)
+    return lines
+
+
+def table_families(compass_variant: str = "copy") -> list[TableFamily]:
+    """All families in output order; the compass variant family only when one is selected."""
+    families = [
+        TableFamily("bar", KERNEL_INC, _section_bar),
+        TableFamily("compass_strip", KERNEL_INC, _section_compass_strip),
+        TableFamily("gear_ui", KERNEL_INC, _section_gear_ui),
+        TableFamily("overlay", KERNEL_INC, _section_overlay),
+        TableFamily("horizon", KERNEL_INC, _section_horizon),
+        TableFamily("map_masks", PAUSE_INC, _section_map_masks),
+    ]
+    if compass_variant != "copy":
+        families.append(
+            TableFamily(f"compass_{compass_variant}", COMPASS_INC, lambda: _section_compass_variant(compass_variant))
+        )
+    return families
 
-    lines: list[str] = []
-    lines.append("; AUTO-GENERATED by tools/gen_tables.py - DO NOT EDIT BY HAND")
-    lines.append("; Pause/map tables (NOT used by the visible kernel).")
-    lines.append("; Playfield bit ordering verified from alienbill playfield diagram.")
-    lines.append("")
 
-    for k, v in map_masks.items():
-        _emit_tables(lines, k, v)
+def render_includes(families: list[TableFamily], sections: dict[str, list[str]]) -> dict[str, str]:
+    """Assemble family sections into include-file text, keyed by include file name."""
+    out: dict[str, list[str]] = {}
+    for family in families:
+        out.setdefault(family.include, list(INC_HEADERS[family.include])).extend(sections[family.name])
+    return {name: "\n".join(lines) + "\n" for name, lines in out.items()}
+
+
+# --------------------
+# Watch mode
+# --------------------
+
+
+def family_fingerprint(obj: object, namespace: dict[str, object], seen: set[int] | None = None) -> object:
+    """
+    A comparable summary of a generator and everything it references by name.
+
+    Uses bytecode, constants and referenced module globals but *not* line numbers,
+    so editing one generator doesn't invalidate the families below it in the file.
+    """
+    seen = set() if seen is None else seen
+    if isinstance(obj, types.CodeType):
+        refs = tuple(
+            (n, family_fingerprint(namespace[n], namespace, seen)) for n in obj.co_names if n in namespace
+        )
+        consts = tuple(family_fingerprint(c, namespace, seen) for c in obj.co_consts)
+        return obj.co_code, obj.co_names, consts, refs
+    if isinstance(obj, types.FunctionType):
+        if id(obj) in seen:
+            return ("fn", obj.__qualname__)
+        seen.add(id(obj))
+        cells = tuple(family_fingerprint(c.cell_contents, namespace, seen) for c in obj.__closure__ or ())
+        return (
+            family_fingerprint(obj.__code__, namespace, seen),
+            family_fingerprint(obj.__defaults__, namespace, seen),
+            cells,
+        )
+    if isinstance(obj, type) and obj.__module__ == namespace.get("__name__"):
+        if id(obj) in seen:
+            return ("cls", obj.__qualname__)
+        seen.add(id(obj))
+        members = tuple(
+            (k, family_fingerprint(v, namespace, seen))
+            for k, v in vars(obj).items()
+            if isinstance(v, (types.FunctionType, property))
+        )
+        return obj.__qualname__, repr(obj.__dict__.get("__annotations__")), members
+    if isinstance(obj, property):
+        return family_fingerprint(obj.fget, namespace, seen)
+    if isinstance(obj, (type, types.ModuleType, types.BuiltinFunctionType)) or callable(obj):
+        return ("ext", getattr(obj, "__qualname__", getattr(obj, "__name__", type(obj).__name__)))
+    if isinstance(obj, tuple):
+        return tuple(family_fingerprint(o, namespace, seen) for o in obj)
+    return repr(obj)
+
+
+def _load_generator(path: Path) -> types.ModuleType:
+    """Execute a fresh copy of this script so edits to generators take effect."""
+    spec = importlib.util.spec_from_file_location("_gen_tables_watch", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclasses resolve annotations through sys.modules
+    spec.loader.exec_module(module)
+    return module
+
+
+def _regenerate(
+    module: types.ModuleType,
+    out_dir: Path,
+    compass_variant: str,
+    memo: dict[tuple[str, str], list[str]],
+    written: dict[str, str],
+) -> None:
+    t0 = time.perf_counter()
+    namespace = vars(module)
+    families = module.table_families(compass_variant)
+    sections: dict[str, list[str]] = {}
+    cached = 0
+    for family in families:
+        key = (family.name, hashlib.sha1(repr(family_fingerprint(family.build, namespace)).encode()).hexdigest())
+        if key in memo:
+            cached += 1
+        else:
+            f0 = time.perf_counter()
+            memo[key] = family.build()
+            print(f"  {family.name:16} {(time.perf_counter() - f0) * 1000:7.1f} ms")
+        sections[family.name] = memo[key]
+
+    for name, text in module.render_includes(families, sections).items():
+        path = out_dir / name
+        if name not in written and path.exists():
+            written[name] = path.read_text(encoding="utf-8")
+        if written.get(name) != text:
+            path.write_text(text, encoding="utf-8")
+            written[name] = text
+            print(f"  wrote {path}")
+    print(f"Regenerated in {(time.perf_counter() - t0) * 1000:.1f} ms ({cached} families cached)")
+
+
+def watch(src: Path, out_dir: Path, compass_variant: str, interval: float) -> None:
+    """
+    Poll `src` (this script: glyphs, ridge patterns and overlay positions live here)
+    and regenerate only the table families whose generator code or data changed.
 
-    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    Results stay memoized for the life of the process, so undoing an edit is free.
+    """
+    memo: dict[tuple[str, str], list[str]] = {}
+    written: dict[str, str] = {}
+    last: tuple[int, int] | None = None
+    print(f"Watching {src} (Ctrl+C to stop)")
+    while True:
+        try:
+            st = src.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamp = None  # editors may replace the file; try again next poll
+        if stamp is not None and stamp != last:
+            last = stamp
+            try:
+                _regenerate(_load_generator(src), out_dir, compass_variant, memo, written)
+            except Exception as e:  # keep watching through typos and failed asserts
+                print(f"ERROR: {type(e).__name__}: {e}")
+        time.sleep(interval)
 
 
 def main() -> None:
+    ap = argparse.ArgumentParser(description="Generate playfield lookup tables (DASM include files).")
+    ap.add_argument(
+        "--compass-variant",
+        choices=("copy", "dotrow", "frame"),
+        default="copy",
+        help="also write precomputed compass tables to generated_compass_tables.inc (default: copy = none)",
+    )
+    ap.add_argument("--compass-report", action="store_true", help="print ROM bytes vs VBLANK cycles per variant")
+    ap.add_argument("--watch", action="store_true", help="keep running and regenerate when this script changes")
+    ap.add_argument("--interval", type=float, default=0.2, help="--watch polling interval in seconds")
+    args = ap.parse_args()
+
     out_dir = Path("src/include")
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    kernel_out = out_dir / "generated_kernel_tables.inc"
-    pause_out = out_dir / "generated_pause_tables.inc"
+    if args.compass_report:
+        print(format_compass_report(gen_compass_variants(gen_compass_strip_tables())))
 
-    write_kernel_inc(kernel_out)
-    write_pause_inc(pause_out)
-    print(f"Wrote {kernel_out}")
-    print(f"Wrote {pause_out}")
+    if args.watch:
+        try:
+            watch(Path(__file__).resolve(), out_dir, args.compass_variant, args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    families = table_families(args.compass_variant)
+    for name, text in render_includes(families, {f.name: f.build() for f in families}).items():
+        path = out_dir / name
+        path.write_text(text, encoding="utf-8")
+        print(f"Wrote {path}")
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,390 @@
+"""
+Zero-page RAM budget and worst-case stack depth for the Atari 2600 Mecha Simulator.
+
+All game state lives in the 128 bytes of RIOT RAM at $80-$FF, and the stack
+shares the same page: `CLEAN_START` sets SP=$FF and every `jsr` pushes 2 bytes
+(`pha`/`php` push 1) downward from there. So the real budget is
+
+    free = 128 - variables - worst-case stack
+
+This script reports exactly that:
+- bytes used/free by the `SEG.U Variables` block (via `ram_map.py`)
+- the static call graph (`jsr`, plus tail calls via `jmp`/branches to other
+  routines and fall-through into the next routine)
+- the deepest call chain from the reset vectors and its stack bytes
+- any variables that the worst-case stack would overwrite
+- how many more TANK_COUNT-sized entries (TankX/TankY/...) would still fit
+
+The call graph is built from `src/mecha.asm` (includes and macros expanded),
+or from a DASM listing with `--lst build/mecha.lst`. A bankcall stub such as
+`CallBuildPauseMap` is just another routine here: its `jsr` runs in the other
+bank but on the same stack.
+
+Exits 1 if the worst-case stack overlaps a variable (usable as a build gate).
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ram_map import RAM_END, RAM_START, RamVar, parse_constants, parse_ram_map, strip_comment
+
+MNEMONICS = frozenset(
+    "adc and asl bcc bcs beq bit bmi bne bpl brk bvc bvs clc cld cli clv cmp cpx cpy dec dex dey "
+    "eor inc inx iny jmp jsr lda ldx ldy lsr nop ora pha php pla plp rol ror rti rts sbc sec sed "
+    "sei sta stx sty tax tay tsx txa txs tya".split()
+)
+DIRECTIVES = frozenset(
+    "processor include seg seg.u org rorg .byte byte .word word dc dc.b dc.w ds ds.b mac endm "
+    "if ifconst ifnconst else endif echo align equ = subroutine repeat repend err incbin".split()
+)
+BRANCHES = frozenset("bcc bcs beq bmi bne bpl bvc bvs".split())
+TERMINATORS = frozenset(("rts", "rti", "jmp", "brk"))
+
+# `TANK_COUNT` arrays are what grows when tanks are added.
+DEFAULT_UNIT = "TANK_COUNT"
+
+_INCLUDE_RE = re.compile(r'^\s*include\s+"([^"]+)"', re.IGNORECASE)
+# DASM listing: "  1234  f000 ..." or "  1234+ f000 ..." (macro expansion), then bytes, then source.
+_LST_RE = re.compile(r"^\s*\d+[+ ]?\s+(?:[0-9a-fA-F]{4}|\?{4})(?:\s+\?{4})?(.*)$")
+_LST_BYTES_RE = re.compile(r"^(?:[0-9a-fA-F]{2}\s?)*\*?$")
+
+
+@dataclass
+class Routine:
+    name: str
+    # (op, target, pushed-before) for jsr/jmp/branch to another routine.
+    calls: list[tuple[str, str, int]] = field(default_factory=list)
+    max_pushed: int = 0
+    falls_into: str | None = None
+    pushed_at_end: int = 0
+
+
+@dataclass
+class StackResult:
+    depth: int
+    chain: list[str]
+
+
+# ---- source loading ----
+
+
+def load_source(asm_path: Path, include_dirs: list[Path]) -> list[str]:
+    """Source lines with `include`s inlined (macro bodies are expanded later)."""
+    out: list[str] = []
+    for raw in asm_path.read_text(encoding="utf-8").splitlines():
+        m = _INCLUDE_RE.match(strip_comment(raw))
+        if m:
+            for d in [asm_path.parent, *include_dirs]:
+                inc = d / m.group(1)
+                if inc.exists():
+                    out.extend(load_source(inc, include_dirs))
+                    break
+            else:
+                raise SystemExit(f"ERROR: include not found: {m.group(1)} (from {asm_path})")
+            continue
+        out.append(raw)
+    return out
+
+
+def load_listing(lst_path: Path) -> list[str]:
+    """Source text column of a DASM listing (includes and macro expansions are already inline)."""
+    out: list[str] = []
+    for raw in lst_path.read_text(encoding="utf-8", errors="replace").splitlines():
+        m = _LST_RE.match(raw)
+        if not m:
+            continue
+        fields = m.group(1).split("\t")
+        while fields and _LST_BYTES_RE.match(fields[0].strip()):
+            fields.pop(0)
+        out.append(" ".join(fields))
+    return out
+
+
+def _split_statement(line: str, macros: set[str]) -> tuple[str | None, list[str]]:
+    """Return (label, [op, operand...]) for one source line (comments already stripped)."""
+    tokens = line.split(None, 1)
+    if not tokens:
+        return None, []
+    first = tokens[0].rstrip(":")
+    low = first.lower()
+    if low in MNEMONICS or low in DIRECTIVES or first in macros:
+        return None, [low if first not in macros else first] + tokens[1:]
+    rest = tokens[1].split(None, 1) if len(tokens) > 1 else []
+    if rest and rest[0].lower() in MNEMONICS:
+        rest[0] = rest[0].lower()
+    return first, rest
+
+
+def expand_macros(lines: list[str], expand: bool) -> tuple[list[str], set[str]]:
+    """Drop `MAC ... ENDM` definitions; inline their bodies at each use when `expand`."""
+    macros: dict[str, list[str]] = {}
+    out: list[str] = []
+    current: str | None = None
+    for raw in lines:
+        line = strip_comment(raw)
+        tokens = line.split()
+        if current is not None:
+            if tokens and tokens[0].lower() == "endm":
+                current = None
+            else:
+                macros[current].append(line)
+            continue
+        if tokens and tokens[0].lower() == "mac" and len(tokens) > 1:
+            current = tokens[1]
+            macros[current] = []
+            continue
+        if expand and tokens and tokens[0] in macros and not line[:1].strip():
+            out.extend(macros[tokens[0]])
+            continue
+        out.append(line)
+    return out, set(macros)
+
+
+# ---- call graph ----
+
+
+def build_call_graph(lines: list[str], macros: set[str]) -> tuple[dict[str, Routine], list[str]]:
+    """
+    Split the program into routines at global labels and collect their calls.
+
+    Returns (routines, entry points from the reset/IRQ vectors).
+    """
+    routines: dict[str, Routine] = {}
+    entries: list[str] = []
+    cur: Routine | None = None
+    segment = "?"
+    rorg = 0
+    pushed = 0
+    terminated = True  # nothing to fall through from at the top of the file
+    in_vectors = False
+
+    def start(name: str) -> Routine:
+        nonlocal pushed, terminated
+        r = routines.setdefault(name, Routine(name))
+        if cur is not None and not terminated and cur is not r:
+            cur.falls_into = name
+            cur.pushed_at_end = pushed
+        pushed = 0
+        terminated = False
+        return r
+
+    for line in lines:
+        label, stmt = _split_statement(line, macros)
+        if label and stmt[:1] in (["="], ["equ"]):
+            continue
+        if label and not label.startswith("."):
+            cur = start(label)
+        if not stmt:
+            continue
+        op, operand = stmt[0], (stmt[1].strip() if len(stmt) > 1 else "")
+
+        if op in ("seg", "seg.u"):
+            segment = operand.split()[0] if operand else "?"
+            cur, terminated = None, True
+            continue
+        if op in ("org", "rorg"):
+            if op == "rorg":
+                rorg = int(operand.lstrip("$"), 16) if operand.startswith("$") else 0
+                in_vectors = rorg >= 0xFFFA
+            # Code placed at a new origin doesn't fall through from what came before.
+            cur, terminated = None, True
+            continue
+        if op in (".word", "word", "dc.w") and in_vectors:
+            entries.extend(w.strip() for w in operand.split(",") if w.strip())
+            continue
+        if op not in MNEMONICS:
+            continue
+
+        if cur is None:
+            # Unlabeled code after an ORG/RORG (e.g. the bank2 copy of the $FFE0 stub).
+            cur = start(f"{segment}@${rorg:04X}")
+        if op in ("pha", "php"):
+            pushed += 1
+            cur.max_pushed = max(cur.max_pushed, pushed)
+        elif op in ("pla", "plp"):
+            pushed = max(0, pushed - 1)
+        elif op in ("jsr", "jmp") or op in BRANCHES:
+            target = operand.split()[0] if operand else ""
+            if re.fullmatch(r"[A-Za-z_]\w*", target):
+                cur.calls.append((op, target, pushed))
+        if op in TERMINATORS:
+            terminated = True
+        elif terminated:
+            # Reachable only via a local label; keep attributing it to `cur`.
+            terminated = False
+
+    return routines, entries
+
+
+def _edges(r: Routine, routines: dict[str, Routine]) -> list[tuple[str, str, int]]:
+    """(op, target, bytes on the stack when `target` starts) for edges into other routines."""
+    edges = list(r.calls)
+    if r.falls_into:
+        edges.append(("fall", r.falls_into, r.pushed_at_end))
+    return [(op, t, pushed + (2 if op == "jsr" else 0)) for op, t, pushed in edges if t in routines]
+
+
+def _strongly_connected(routines: dict[str, Routine], root: str) -> dict[str, int]:
+    """Tarjan's algorithm over the routines reachable from `root`: name -> component id."""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    comp: dict[str, int] = {}
+    stack: list[str] = []
+    components: list[str] = []
+
+    def connect(v: str) -> None:
+        index[v] = low[v] = len(index)
+        stack.append(v)
+        for _op, t, _w in _edges(routines[v], routines):
+            if t not in index:
+                connect(t)
+                low[v] = min(low[v], low[t])
+            elif t not in comp:
+                low[v] = min(low[v], index[t])
+        if low[v] == index[v]:
+            cid = len(components)
+            components.append(v)
+            while True:
+                w = stack.pop()
+                comp[w] = cid
+                if w == v:
+                    break
+
+    connect(root)
+    return comp
+
+
+def _path(routines: dict[str, Routine], comp: dict[str, int], src: str, dst: str) -> list[str]:
+    """Shortest chain of routines from `src` to `dst` inside one component (inclusive)."""
+    prev: dict[str, str] = {src: src}
+    queue = [src]
+    for v in queue:
+        if v == dst:
+            break
+        for _op, t, _w in _edges(routines[v], routines):
+            if comp.get(t) == comp[src] and t not in prev:
+                prev[t] = v
+                queue.append(t)
+    chain = [dst]
+    while chain[-1] != src:
+        chain.append(prev[chain[-1]])
+    return chain[::-1]
+
+
+def stack_depth(routines: dict[str, Routine], root: str) -> StackResult:
+    """
+    Worst-case bytes pushed from entering `root` (its own return address excluded).
+
+    Loops made only of `jmp`/branch/fall-through edges (a frame loop, or a label in the
+    middle of one) push nothing and are fine. A cycle that pushes bytes on the way round
+    (a `jsr`, or a `pha` before the jump) is unbounded recursion: exits with an error.
+    """
+    if root not in routines:
+        # Not a routine (e.g. a data label or an equate used as a jump target).
+        return StackResult(0, [root])
+    comp = _strongly_connected(routines, root)
+    members: dict[int, list[str]] = {}
+    for name, cid in comp.items():
+        members.setdefault(cid, []).append(name)
+
+    for name, cid in comp.items():
+        for op, t, w in _edges(routines[name], routines):
+            if comp[t] == cid and w > 0:
+                cycle = " -> ".join([name] + _path(routines, comp, t, name))
+                raise SystemExit(f"ERROR: recursive call chain ({op}), stack depth is unbounded: {cycle}")
+
+    # Every routine in a component runs at the same stack offset, so the worst case is
+    # per component: (depth, routine where it's reached, chain from that routine).
+    memo: dict[int, tuple[int, str, list[str]]] = {}
+
+    def visit_comp(cid: int) -> tuple[int, str, list[str]]:
+        if cid not in memo:
+            best: tuple[int, str, list[str]] | None = None
+            for name in members[cid]:
+                r = routines[name]
+                if best is None or r.max_pushed > best[0]:
+                    best = (r.max_pushed, name, [name])
+                for _op, t, w in _edges(r, routines):
+                    if comp[t] == cid:
+                        continue
+                    sub = visit(t)
+                    if w + sub.depth > best[0]:
+                        best = (w + sub.depth, name, [name] + sub.chain)
+            assert best is not None
+            memo[cid] = best
+        return memo[cid]
+
+    def visit(name: str) -> StackResult:
+        depth, at, chain = visit_comp(comp[name])
+        return StackResult(depth, _path(routines, comp, name, at)[:-1] + chain)
+
+    return visit(root)
+
+
+# ---- report ----
+
+
+def main() -> int:
+    """CLI entrypoint. Exits 1 if the worst-case stack overlaps a variable."""
+    ap = argparse.ArgumentParser(description="Report zero-page RAM use and worst-case stack depth.")
+    ap.add_argument("--asm", type=Path, default=Path("src/mecha.asm"))
+    ap.add_argument("--include", type=Path, action="append", default=[Path("src/include")],
+                    help="include directory (default: src/include)")
+    ap.add_argument("--lst", type=Path, help="build the call graph from a DASM listing instead of the source")
+    ap.add_argument("--unit", default=DEFAULT_UNIT, help="array-size constant to budget for (default: TANK_COUNT)")
+    ap.add_argument("--map", action="store_true", help="also print every variable with its address")
+    args = ap.parse_args()
+
+    variables = parse_ram_map(args.asm, check_bounds=False)
+    if args.lst is not None:
+        if not args.lst.exists():
+            raise SystemExit(f"ERROR: listing not found: {args.lst}")
+        lines, macros = expand_macros(load_listing(args.lst), expand=False)
+    else:
+        lines, macros = expand_macros(load_source(args.asm, args.include), expand=True)
+    routines, entries = build_call_graph(lines, macros)
+    if not entries:
+        raise SystemExit("ERROR: no reset/IRQ vectors found (`.word` after `RORG $FFFC`)")
+
+    worst = max((stack_depth(routines, e) for e in dict.fromkeys(entries)), key=lambda r: r.depth)
+    vars_end = max((v.end for v in variables), default=RAM_START)
+    used = sum(v.size for v in variables)
+    ram_size = RAM_END - RAM_START
+    stack_low = RAM_END - worst.depth  # lowest address the stack can reach
+    overlap: list[RamVar] = [v for v in variables if v.end > stack_low]
+    free = ram_size - used - worst.depth
+
+    if args.map:
+        for v in variables:
+            print(f"  ${v.addr:02X}-${v.end - 1:02X}  {v.size:3d}  {v.name}")
+        print()
+
+    print(f"Variables: {used} bytes used (${RAM_START:02X}-${vars_end - 1:02X}), {ram_size - used} bytes free")
+    print(f"Worst-case stack: {worst.depth} bytes (${stack_low:02X}-$FF) via")
+    print("  " + " -> ".join(worst.chain))
+    print(f"Free after worst-case stack: {free} bytes")
+
+    unit_count = parse_constants(args.asm.read_text(encoding="utf-8").splitlines()).get(args.unit)
+    unit_re = re.compile(rf"\b{re.escape(args.unit)}\b")
+    unit_vars = [v for v in variables if unit_re.search(v.size_expr)]
+    if unit_count and unit_vars:
+        per_unit = sum(v.size for v in unit_vars) // unit_count
+        names = ", ".join(v.name for v in unit_vars)
+        print(
+            f"{args.unit}={unit_count}: {per_unit} bytes per unit ({names}); "
+            f"{max(0, free) // per_unit} more would fit"
+        )
+
+    if overlap:
+        names = ", ".join(f"{v.name} (${v.addr:02X})" for v in overlap)
+        print(f"ERROR: worst-case stack overlaps variables: {names}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
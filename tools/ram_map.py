@@ -0,0 +1,146 @@
+"""
+Read the RIOT RAM layout straight from `src/mecha.asm`.
+
+The game keeps all of its state in the 128 bytes at $80-$FF, declared as a
+`SEG.U Variables` block of `Name ds N` lines. Several tools need the same
+name -> address mapping (replay/diff harness, RAM budget report), and parsing
+the source means they work without a DASM symbol file and stay in sync with
+the assembler's layout rules:
+- `ORG` sets the location counter
+- `ds N` reserves N bytes (N may be an expression such as `TANK_COUNT`)
+- constants come from `NAME = expr` / `NAME equ expr` lines anywhere in the file
+"""
+
+from __future__ import annotations
+
+import ast
+import operator
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+RAM_START = 0x80
+RAM_END = 0x100  # exclusive
+
+_CONST_RE = re.compile(r"^([A-Za-z_]\w*)\s*(?:=|\s[eE][qQ][uU]\s)\s*(.+)$")
+_DS_RE = re.compile(r"^([A-Za-z_]\w*):?\s+ds(?:\.b)?\s+(.+)$", re.IGNORECASE)
+_ORG_RE = re.compile(r"^\s+ORG\s+(.+)$", re.IGNORECASE)
+_SEG_RE = re.compile(r"^\s+SEG(\.U)?\s+(\w+)", re.IGNORECASE)
+
+_BINOPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.FloorDiv: operator.floordiv,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+}
+
+
+@dataclass(frozen=True)
+class RamVar:
+    name: str
+    addr: int
+    size: int
+    comment: str = ""
+    size_expr: str = ""  # the `ds` operand as written, e.g. "TANK_COUNT"
+
+    @property
+    def end(self) -> int:
+        """One past the last byte."""
+        return self.addr + self.size
+
+
+def strip_comment(line: str) -> str:
+    """Drop a trailing `; comment` (DASM has no `;` inside operands we care about)."""
+    return line.split(";", 1)[0].rstrip()
+
+
+def eval_expr(expr: str, consts: dict[str, int]) -> int:
+    """
+    Evaluate a DASM operand expression: `$hex`, `%bin`, decimal, names, + - * / & | << >>.
+
+    Raises ValueError for anything else (including unknown names).
+    """
+    py = re.sub(r"\$([0-9A-Fa-f]+)", r"0x\1", expr.strip())
+    py = re.sub(r"%([01]+)", r"0b\1", py)
+    py = py.replace("/", "//")
+    try:
+        tree = ast.parse(py, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"bad expression: {expr!r}") from e
+
+    def ev(node: ast.AST) -> int:
+        if isinstance(node, ast.Expression):
+            return ev(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in consts:
+                raise ValueError(f"unknown symbol {node.id!r} in {expr!r}")
+            return consts[node.id]
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -ev(node.operand)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINOPS:
+            return _BINOPS[type(node.op)](ev(node.left), ev(node.right))
+        raise ValueError(f"unsupported expression: {expr!r}")
+
+    return ev(tree)
+
+
+def parse_constants(lines: list[str]) -> dict[str, int]:
+    """Collect `NAME = expr` constants, in source order (later ones may use earlier ones)."""
+    consts: dict[str, int] = {}
+    for raw in lines:
+        m = _CONST_RE.match(strip_comment(raw))
+        if not m:
+            continue
+        try:
+            consts[m.group(1)] = eval_expr(m.group(2), consts)
+        except ValueError:
+            # Forward references / label arithmetic aren't RAM-layout relevant.
+            continue
+    return consts
+
+
+def parse_ram_map(asm_path: Path, segment: str = "Variables", check_bounds: bool = True) -> list[RamVar]:
+    """
+    Return the variables declared in `SEG.U <segment>`, in address order.
+
+    Raises ValueError if the segment is missing or (with `check_bounds`) runs past $FF.
+    """
+    lines = asm_path.read_text(encoding="utf-8").splitlines()
+    consts = parse_constants(lines)
+
+    out: list[RamVar] = []
+    in_seg = False
+    found = False
+    pc = RAM_START
+    for raw in lines:
+        line = strip_comment(raw)
+        seg = _SEG_RE.match(line)
+        if seg:
+            in_seg = seg.group(2) == segment
+            found = found or in_seg
+            continue
+        if not in_seg:
+            continue
+        org = _ORG_RE.match(line)
+        if org:
+            pc = eval_expr(org.group(1), consts)
+            continue
+        ds = _DS_RE.match(line)
+        if ds:
+            size_expr = ds.group(2).strip()
+            size = eval_expr(size_expr, consts)
+            comment = raw.split(";", 1)[1].strip() if ";" in raw else ""
+            out.append(RamVar(ds.group(1), pc, size, comment, size_expr))
+            pc += size
+
+    if not found:
+        raise ValueError(f"{asm_path}: no `SEG.U {segment}` block")
+    if check_bounds and pc > RAM_END:
+        raise ValueError(f"{asm_path}: {segment} ends at ${pc:04X}, past the end of RIOT RAM")
+    return out
@@ -0,0 +1,294 @@
+"""
+Deterministic input replay for `build/mecha.bin` (no emulator GUI needed).
+
+Runs the ROM on the headless 6507/RIOT model in `vcs6507.py`, feeding one
+recorded joystick/button sample per frame, and prints named RAM variables
+(names/addresses come from the `SEG.U Variables` block in `src/mecha.asm`).
+
+Input files have one entry per line; `#` starts a comment:
+    -*60        # 60 frames, nothing pressed
+    U           # one frame of joystick up (gear up)
+    LF*30       # 30 frames of left + fire (torso twist left)
+Letters: U/D/L/R = joystick, F = fire button, `-` = nothing. Past the end of
+the file the stick is released.
+
+Frame N means "after N frames of input", counted from the first VSYNC after
+power-on. A compact savestate (RAM, CPU registers, bank, timer) is kept every
+`--every` frames (default 60, about 150 bytes each), so `seek` restores the
+nearest state and only replays the tail. The model runs roughly 100 frames/s,
+so at the default interval a seek replays at most 59 frames (~0.6 s) however
+far into the session it lands; `--states FILE` persists the states between runs
+so off-map/LIDAR bugs that appear minutes in can be revisited quickly.
+
+Usage:
+    python tools/replay.py run session.txt --frames 3600 --print-every 60
+    python tools/replay.py run session.txt --states session.states
+    python tools/replay.py seek 3000 session.txt --states session.states --vars all
+    python tools/replay.py diff before.txt after.txt --vars LidarHi,OffMapHi
+    python tools/replay.py diff session.txt --rom-b build/mecha_old.bin
+The common options (--rom, --asm, --vars, --every) go before or after the subcommand.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import hashlib
+import re
+import struct
+from pathlib import Path
+
+from ram_map import RamVar, parse_ram_map
+from vcs6507 import STATE_SIZE, Machine
+
+DEFAULT_VARS = (
+    "GameMode", "GearIdx", "LegHeading", "TorsoOffset", "ViewDir",
+    "PlayerXTile", "PlayerYTile", "OffMapHi", "OffMapLo", "LidarHi",
+    "TankX", "TankY",
+)
+
+INPUT_BITS = {"U": 0x01, "D": 0x02, "L": 0x04, "R": 0x08, "F": 0x10}
+_INPUT_RE = re.compile(r"^([UDLRF]+|-)(?:\s*\*\s*(\d+))?$")
+
+STATES_MAGIC = b"MECHSS1\0"
+_STATES_HEADER = struct.Struct("<8s20s20sII")  # magic, ROM sha1, inputs sha1, every, count
+_STATE_FRAME = struct.Struct("<I")
+
+
+def parse_inputs(text: str) -> list[int]:
+    """Parse an input file into one bitmask (see INPUT_BITS) per frame."""
+    frames: list[int] = []
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].strip().upper()
+        if not line:
+            continue
+        m = _INPUT_RE.match(line)
+        if not m:
+            raise ValueError(f"line {lineno}: expected e.g. `UF`, `-*60`, got {raw.strip()!r}")
+        mask = 0 if m.group(1) == "-" else sum(INPUT_BITS[c] for c in set(m.group(1)))
+        frames.extend([mask] * int(m.group(2) or 1))
+    return frames
+
+
+class Replay:
+    """A ROM + input stream, with savestates every `every` frames."""
+
+    def __init__(self, rom: bytes, inputs: list[int], every: int = 60, start_bank: int = 0) -> None:
+        if every < 1:
+            raise ValueError("savestate interval must be >= 1 frame")
+        self.rom = rom
+        self.inputs = inputs
+        self.every = every
+        self.machine = Machine(rom, start_bank)
+        self.machine.run_frame()  # power-on -> first VSYNC (Reset/CLEAN_START done)
+        self.frame = 0
+        self.states: dict[int, bytes] = {0: self.machine.save_state()}
+
+    def step(self) -> None:
+        mask = self.inputs[self.frame] if self.frame < len(self.inputs) else 0
+        self.machine.set_inputs(
+            bool(mask & 0x01), bool(mask & 0x02), bool(mask & 0x04), bool(mask & 0x08), bool(mask & 0x10)
+        )
+        self.machine.run_frame()
+        self.frame += 1
+        if self.frame % self.every == 0 and self.frame not in self.states:
+            self.states[self.frame] = self.machine.save_state()
+
+    def seek(self, frame: int) -> None:
+        """Restore the nearest savestate at or before `frame`, then replay forward."""
+        if frame < 0:
+            raise ValueError("frame must be >= 0")
+        keys = sorted(self.states)
+        base = keys[bisect.bisect_right(keys, frame) - 1]
+        if frame < self.frame or base > self.frame:
+            self.machine.load_state(self.states[base])
+            self.frame = base
+        while self.frame < frame:
+            self.step()
+
+    # ---- persistence ----
+
+    def _digests(self) -> tuple[bytes, bytes]:
+        return hashlib.sha1(self.rom).digest(), hashlib.sha1(bytes(self.inputs)).digest()
+
+    def save_states(self, path: Path) -> None:
+        rom_sha, inputs_sha = self._digests()
+        chunks = [_STATES_HEADER.pack(STATES_MAGIC, rom_sha, inputs_sha, self.every, len(self.states))]
+        for frame in sorted(self.states):
+            chunks.append(_STATE_FRAME.pack(frame) + self.states[frame])
+        path.write_bytes(b"".join(chunks))
+
+    def load_states(self, path: Path) -> bool:
+        """
+        Merge savestates from `path`; returns False (and loads nothing) if they don't match.
+
+        Raises ValueError if the file is truncated or not a savestate file.
+        """
+        data = path.read_bytes()
+        if len(data) < _STATES_HEADER.size:
+            raise ValueError("truncated savestate file")
+        magic, rom_sha, inputs_sha, _every, count = _STATES_HEADER.unpack_from(data)
+        if magic != STATES_MAGIC:
+            raise ValueError("not a savestate file")
+        if len(data) != _STATES_HEADER.size + count * (_STATE_FRAME.size + STATE_SIZE):
+            raise ValueError(f"expected {count} savestates, file size doesn't match")
+        if (rom_sha, inputs_sha) != self._digests():
+            return False
+        off = _STATES_HEADER.size
+        for _ in range(count):
+            (frame,) = _STATE_FRAME.unpack_from(data, off)
+            off += _STATE_FRAME.size
+            self.states[frame] = data[off : off + STATE_SIZE]
+            off += STATE_SIZE
+        return True
+
+    # ---- RAM access ----
+
+    def values(self, variables: list[RamVar]) -> dict[str, tuple[int, ...]]:
+        ram = self.machine.ram
+        return {v.name: tuple(ram[v.addr - 0x80 : v.end - 0x80]) for v in variables}
+
+
+def _format_bytes(vals: tuple[int, ...]) -> str:
+    text = ",".join(f"${b:02X}" for b in vals)
+    return text if len(vals) == 1 else f"[{text}]"
+
+
+def format_values(values: dict[str, tuple[int, ...]]) -> str:
+    return " ".join(f"{name}={_format_bytes(vals)}" for name, vals in values.items())
+
+
+def select_vars(ram_map: list[RamVar], spec: str) -> list[RamVar]:
+    if spec == "all":
+        return ram_map
+    by_name = {v.name: v for v in ram_map}
+    names = [n.strip() for n in spec.split(",") if n.strip()] if spec else list(DEFAULT_VARS)
+    missing = [n for n in names if n not in by_name]
+    if missing:
+        raise SystemExit(f"ERROR: unknown RAM variable(s): {', '.join(missing)}")
+    return [by_name[n] for n in names]
+
+
+def _load_replay(rom_path: Path, inputs_path: Path, args: argparse.Namespace) -> Replay:
+    if not rom_path.exists():
+        raise SystemExit(f"ERROR: ROM file not found: {rom_path}")
+    if not inputs_path.exists():
+        raise SystemExit(f"ERROR: input file not found: {inputs_path}")
+    try:
+        inputs = parse_inputs(inputs_path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise SystemExit(f"ERROR: {inputs_path}: {e}") from e
+    try:
+        replay = Replay(rom_path.read_bytes(), inputs, every=args.every)
+    except ValueError as e:
+        raise SystemExit(f"ERROR: {rom_path}: {e}") from e
+    states = getattr(args, "states", None)
+    if states is not None and states.exists():
+        try:
+            matched = replay.load_states(states)
+        except ValueError as e:
+            raise SystemExit(f"ERROR: {states}: {e}") from e
+        if not matched:
+            print(f"NOTE: {states} was recorded for a different ROM/input stream; ignoring it")
+    return replay
+
+
+def cmd_run(args: argparse.Namespace, variables: list[RamVar]) -> int:
+    replay = _load_replay(args.rom, args.inputs, args)
+    frames = args.frames if args.frames is not None else len(replay.inputs)
+    while replay.frame < frames:
+        replay.step()
+        if args.print_every and replay.frame % args.print_every == 0 and replay.frame != frames:
+            print(f"frame {replay.frame}: {format_values(replay.values(variables))}")
+    print(f"frame {replay.frame}: {format_values(replay.values(variables))}")
+    if args.states is not None:
+        replay.save_states(args.states)
+        print(f"Wrote {len(replay.states)} savestates to {args.states}")
+    return 0
+
+
+def cmd_seek(args: argparse.Namespace, variables: list[RamVar]) -> int:
+    if args.frame < 0:
+        raise SystemExit("ERROR: frame must be >= 0")
+    replay = _load_replay(args.rom, args.inputs, args)
+    replay.seek(args.frame)
+    print(f"frame {replay.frame}: {format_values(replay.values(variables))}")
+    return 0
+
+
+def cmd_diff(args: argparse.Namespace, variables: list[RamVar]) -> int:
+    """Run two replays in lockstep and report frames where the variables differ."""
+    a = _load_replay(args.rom, args.inputs, args)
+    b = _load_replay(args.rom_b or args.rom, args.inputs_b or args.inputs, args)
+    frames = args.frames if args.frames is not None else max(len(a.inputs), len(b.inputs))
+    shown = 0
+    first = None
+    while a.frame < frames:
+        a.step()
+        b.step()
+        va, vb = a.values(variables), b.values(variables)
+        if va == vb:
+            continue
+        first = a.frame if first is None else first
+        if shown < args.max_diffs:
+            diffs = " ".join(
+                f"{n}: {_format_bytes(va[n])} -> {_format_bytes(vb[n])}" for n in va if va[n] != vb[n]
+            )
+            print(f"frame {a.frame}: {diffs}")
+            shown += 1
+    if first is None:
+        print(f"No differences in {frames} frames")
+        return 0
+    print(f"First difference at frame {first}")
+    return 1
+
+
+def _add_common_args(ap: argparse.ArgumentParser, with_defaults: bool = True) -> None:
+    def default(value: object) -> object:
+        return value if with_defaults else argparse.SUPPRESS
+
+    ap.add_argument("--rom", type=Path, default=default(Path("build/mecha.bin")))
+    ap.add_argument("--asm", type=Path, default=default(Path("src/mecha.asm")), help="source for RAM variable names")
+    ap.add_argument(
+        "--vars", default=default(""), help="comma-separated RAM variables, or `all` (default: a gameplay set)"
+    )
+    ap.add_argument("--every", type=int, default=default(60), help="savestate interval in frames (default: 60)")
+
+
+def main() -> int:
+    """CLI entrypoint. Exits 0 on success (diff: 1 if the runs diverge)."""
+    ap = argparse.ArgumentParser(description="Replay recorded inputs on the headless 2600 model.")
+    _add_common_args(ap)
+    # Accept the common options after the subcommand too. Without defaults there, a
+    # subparser doesn't overwrite a value given before the subcommand.
+    common = argparse.ArgumentParser(add_help=False)
+    _add_common_args(common, with_defaults=False)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", parents=[common], help="replay inputs and print variables")
+    run.add_argument("inputs", type=Path)
+    run.add_argument("--frames", type=int, help="frames to run (default: length of the input file)")
+    run.add_argument("--print-every", type=int, default=0, help="also print every N frames")
+    run.add_argument("--states", type=Path, help="write savestates here for later seeks")
+
+    seek = sub.add_parser("seek", parents=[common], help="jump to a frame (using savestates) and print variables")
+    seek.add_argument("frame", type=int)
+    seek.add_argument("inputs", type=Path)
+    seek.add_argument("--states", type=Path, help="savestates written by `run --states`")
+
+    diff = sub.add_parser("diff", parents=[common], help="compare two runs frame by frame")
+    diff.add_argument("inputs", type=Path)
+    diff.add_argument("inputs_b", type=Path, nargs="?", help="second input file (default: same as first)")
+    diff.add_argument("--rom-b", type=Path, help="second ROM (default: same as --rom)")
+    diff.add_argument("--frames", type=int, help="frames to compare (default: longer input file)")
+    diff.add_argument("--max-diffs", type=int, default=20, help="stop printing after N differing frames")
+
+    args = ap.parse_args()
+    if args.every < 1:
+        raise SystemExit("ERROR: --every must be >= 1 frame")
+    variables = select_vars(parse_ram_map(args.asm), args.vars)
+    return {"run": cmd_run, "seek": cmd_seek, "diff": cmd_diff}[args.cmd](args, variables)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
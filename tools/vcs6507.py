@@ -0,0 +1,593 @@
+"""
+Minimal headless Atari 2600 model for deterministic replays.
+
+This is *not* an emulator for looking at the game; it models exactly what the
+game logic depends on, so a frame computed here matches the RAM Stella would
+show at the same frame:
+- 6507 CPU: all documented 6502 opcodes, cycle counts incl. page-cross/branch penalties
+- RIOT: 128 bytes RAM (mirrored for the stack at $01xx), SWCHA/SWCHB, TIM1T..T1024T/INTIM
+- TIA: VSYNC (frame boundary), WSYNC (halt to end of scanline), INPT4/INPT5 buttons
+- F6 cartridge: 4x4K banks, hotspots $FFF6-$FFF9 on read *or* write
+
+Video/audio output is ignored. Undocumented opcodes raise CpuError, which in
+practice means the CPU ran into data (a bad bankswitch or a smashed stack).
+
+State that matters for resuming is small enough to snapshot every few frames:
+see `Machine.save_state()` / `Machine.load_state()`.
+"""
+
+from __future__ import annotations
+
+import struct
+
+CYCLES_PER_LINE = 76
+BANK_SIZE = 0x1000
+HOTSPOT_FIRST = 0x0FF6  # BANK0 ($FFF6) .. BANK3 ($FFF9), as 12-bit cart offsets
+HOTSPOT_LAST = 0x0FF9
+
+TIMER_INTERVALS = (1, 8, 64, 1024)
+
+# Savestate layout: RAM, A X Y S P, PC, bank, cycle-in-scanline, VSYNC latch,
+# timer (cycles since write, value written, interval), SWCHA, INPT4.
+_STATE = struct.Struct("<128s5BHBBBIBHBB")
+STATE_SIZE = _STATE.size
+
+FLAG_C = 0x01
+FLAG_Z = 0x02
+FLAG_I = 0x04
+FLAG_D = 0x08
+FLAG_B = 0x10
+FLAG_U = 0x20
+FLAG_V = 0x40
+FLAG_N = 0x80
+
+
+class CpuError(RuntimeError):
+    pass
+
+
+class Machine:
+    """6507 + RIOT + F6 cart. Call `run_frame()` to advance to the next VSYNC."""
+
+    def __init__(self, rom: bytes, start_bank: int = 0) -> None:
+        if len(rom) % BANK_SIZE or not rom:
+            raise ValueError(f"ROM size must be a multiple of 4K, got {len(rom)}")
+        self.rom = bytes(rom)
+        self.bank_count = len(rom) // BANK_SIZE
+        self.ram = bytearray(128)
+        self.a = self.x = self.y = 0
+        self.s = 0xFD
+        self.p = FLAG_U | FLAG_I
+        self.bank = start_bank
+        self.cycles = 0
+        self.vsync = 0
+        self.frame_started = False
+        # Timer: value written, interval, cycle of the write.
+        self.timer_value = 0
+        self.timer_interval = 1024
+        self.timer_start = 0
+        # Inputs (0 bits = pressed): left joystick is SWCHA high nibble.
+        self.swcha = 0xFF
+        self.swchb = 0x0B  # color, difficulty A/B clear, no reset/select
+        self.inpt4 = 0x80
+        self.inpt5 = 0x80
+        self.pc = self._read_word_rom(0xFFFC)
+        self._ops = _build_op_table(self)
+
+    # ---- memory map ----
+
+    def _read_word_rom(self, addr: int) -> int:
+        off = self.bank * BANK_SIZE + (addr & 0x0FFF)
+        return self.rom[off] | (self.rom[off + 1] << 8)
+
+    def read(self, addr: int) -> int:
+        addr &= 0x1FFF
+        if addr & 0x1000:
+            off = addr & 0x0FFF
+            value = self.rom[self.bank * BANK_SIZE + off]
+            if HOTSPOT_FIRST <= off <= HOTSPOT_LAST and off - HOTSPOT_FIRST < self.bank_count:
+                self.bank = off - HOTSPOT_FIRST
+            return value
+        if addr & 0x80:
+            if not addr & 0x200:
+                return self.ram[addr & 0x7F]
+            if addr & 0x04:
+                if addr & 0x01:
+                    return 0x80 if self._timer_expired() else 0x00
+                return self.intim()
+            port = addr & 0x03
+            if port == 0:
+                return self.swcha
+            if port == 2:
+                return self.swchb
+            return 0x00
+        reg = addr & 0x0F
+        if reg == 0x0C:
+            return self.inpt4
+        if reg == 0x0D:
+            return self.inpt5
+        return 0x00
+
+    def write(self, addr: int, value: int) -> None:
+        addr &= 0x1FFF
+        if addr & 0x1000:
+            off = addr & 0x0FFF
+            if HOTSPOT_FIRST <= off <= HOTSPOT_LAST and off - HOTSPOT_FIRST < self.bank_count:
+                self.bank = off - HOTSPOT_FIRST
+            return
+        if addr & 0x80:
+            if not addr & 0x200:
+                self.ram[addr & 0x7F] = value
+            elif addr & 0x14 == 0x14:
+                self.timer_value = value
+                self.timer_interval = TIMER_INTERVALS[addr & 0x03]
+                self.timer_start = self.cycles
+            return
+        reg = addr & 0x3F
+        if reg == 0x00:
+            if value & 0x02 and not self.vsync:
+                self.frame_started = True
+            self.vsync = value & 0x02
+        elif reg == 0x02:
+            # WSYNC: halt until the start of the next scanline.
+            rem = self.cycles % CYCLES_PER_LINE
+            if rem:
+                self.cycles += CYCLES_PER_LINE - rem
+
+    # ---- RIOT timer ----
+
+    def _timer_ticks(self) -> tuple[int, int]:
+        elapsed = self.cycles - self.timer_start
+        return elapsed, elapsed // self.timer_interval
+
+    def _timer_expired(self) -> bool:
+        _, ticks = self._timer_ticks()
+        return ticks > self.timer_value
+
+    def intim(self) -> int:
+        """INTIM: counts down once per interval, then once per cycle after passing zero."""
+        elapsed, ticks = self._timer_ticks()
+        if ticks <= self.timer_value:
+            return self.timer_value - ticks
+        after = elapsed - (self.timer_value + 1) * self.timer_interval
+        return (0xFF - after) & 0xFF
+
+    # ---- inputs ----
+
+    def set_inputs(self, up: bool, down: bool, left: bool, right: bool, fire: bool) -> None:
+        """Left joystick + button; released bits read as 1."""
+        self.swcha = (
+            0x0F
+            | (0 if up else 0x10)
+            | (0 if down else 0x20)
+            | (0 if left else 0x40)
+            | (0 if right else 0x80)
+        )
+        self.inpt4 = 0x00 if fire else 0x80
+
+    # ---- execution ----
+
+    def step(self) -> None:
+        pc = self.pc
+        opcode = self.read(pc)
+        entry = self._ops[opcode]
+        if entry is None:
+            raise CpuError(f"undocumented opcode ${opcode:02X} at ${pc:04X} (bank{self.bank})")
+        self.pc = (pc + 1) & 0xFFFF
+        fn, cycles = entry
+        self.cycles += cycles
+        fn()
+
+    def run_frame(self, max_cycles: int = CYCLES_PER_LINE * 262 * 4) -> None:
+        """Run until VSYNC is next switched on (the start of a frame)."""
+        self.frame_started = False
+        limit = self.cycles + max_cycles
+        step = self.step
+        while not self.frame_started:
+            step()
+            if self.cycles > limit:
+                raise CpuError(f"no VSYNC within {max_cycles} cycles (PC=${self.pc:04X}, bank{self.bank})")
+
+    # ---- savestates ----
+
+    def save_state(self) -> bytes:
+        return _STATE.pack(
+            bytes(self.ram), self.a, self.x, self.y, self.s, self.p, self.pc, self.bank,
+            self.cycles % CYCLES_PER_LINE, self.vsync,
+            min(self.cycles - self.timer_start, 0xFFFFFFFF), self.timer_value, self.timer_interval,
+            self.swcha, self.inpt4,
+        )
+
+    def load_state(self, state: bytes) -> None:
+        (
+            ram, self.a, self.x, self.y, self.s, self.p, self.pc, self.bank,
+            line_cycle, self.vsync, timer_elapsed, self.timer_value, self.timer_interval,
+            self.swcha, self.inpt4,
+        ) = _STATE.unpack(state)
+        self.ram[:] = ram
+        self.cycles = line_cycle
+        self.timer_start = self.cycles - timer_elapsed
+        self.frame_started = False
+
+    # ---- flag helpers ----
+
+    def _nz(self, v: int) -> None:
+        self.p = (self.p & ~(FLAG_N | FLAG_Z)) | (v & FLAG_N) | (0 if v else FLAG_Z)
+
+    def _push(self, v: int) -> None:
+        self.write(0x100 | self.s, v)
+        self.s = (self.s - 1) & 0xFF
+
+    def _pull(self) -> int:
+        self.s = (self.s + 1) & 0xFF
+        return self.read(0x100 | self.s)
+
+
+def _build_op_table(m: Machine) -> list:
+    """
+    Build the 256-entry dispatch table of (handler, base cycles) closures over `m`.
+
+    Addressing-mode helpers return the effective address (and add the page-cross
+    cycle for read instructions); operation helpers take that address.
+    """
+    read = m.read
+    write = m.write
+
+    def fetch() -> int:
+        v = read(m.pc)
+        m.pc = (m.pc + 1) & 0xFFFF
+        return v
+
+    def fetch_word() -> int:
+        lo = fetch()
+        return lo | (fetch() << 8)
+
+    # -- addressing modes (penalty=True adds a cycle on page cross, used by reads) --
+    def imm(_penalty: bool) -> int:
+        addr = m.pc
+        m.pc = (m.pc + 1) & 0xFFFF
+        return addr
+
+    def zp(_penalty: bool) -> int:
+        return fetch()
+
+    def zpx(_penalty: bool) -> int:
+        return (fetch() + m.x) & 0xFF
+
+    def zpy(_penalty: bool) -> int:
+        return (fetch() + m.y) & 0xFF
+
+    def ab(_penalty: bool) -> int:
+        return fetch_word()
+
+    def abx(penalty: bool) -> int:
+        base = fetch_word()
+        addr = (base + m.x) & 0xFFFF
+        if penalty and (base ^ addr) & 0xFF00:
+            m.cycles += 1
+        return addr
+
+    def aby(penalty: bool) -> int:
+        base = fetch_word()
+        addr = (base + m.y) & 0xFFFF
+        if penalty and (base ^ addr) & 0xFF00:
+            m.cycles += 1
+        return addr
+
+    def izx(_penalty: bool) -> int:
+        z = (fetch() + m.x) & 0xFF
+        return read(z) | (read((z + 1) & 0xFF) << 8)
+
+    def izy(penalty: bool) -> int:
+        z = fetch()
+        base = read(z) | (read((z + 1) & 0xFF) << 8)
+        addr = (base + m.y) & 0xFFFF
+        if penalty and (base ^ addr) & 0xFF00:
+            m.cycles += 1
+        return addr
+
+    ops: list = [None] * 256
+
+    def reg(opcode: int, cycles: int, fn) -> None:
+        ops[opcode] = (fn, cycles)
+
+    def reader(mode, op):
+        return lambda: op(read(mode(True)))
+
+    def writer(mode, op):
+        return lambda: write(mode(False), op())
+
+    def rmw(mode, op):
+        def run() -> None:
+            addr = mode(False)
+            write(addr, op(read(addr)))
+        return run
+
+    # -- loads / stores --
+    def lda(v: int) -> None:
+        m.a = v
+        m._nz(v)
+
+    def ldx(v: int) -> None:
+        m.x = v
+        m._nz(v)
+
+    def ldy(v: int) -> None:
+        m.y = v
+        m._nz(v)
+
+    for opc, mode, cyc in ((0xA9, imm, 2), (0xA5, zp, 3), (0xB5, zpx, 4), (0xAD, ab, 4),
+                           (0xBD, abx, 4), (0xB9, aby, 4), (0xA1, izx, 6), (0xB1, izy, 5)):
+        reg(opc, cyc, reader(mode, lda))
+    for opc, mode, cyc in ((0xA2, imm, 2), (0xA6, zp, 3), (0xB6, zpy, 4), (0xAE, ab, 4), (0xBE, aby, 4)):
+        reg(opc, cyc, reader(mode, ldx))
+    for opc, mode, cyc in ((0xA0, imm, 2), (0xA4, zp, 3), (0xB4, zpx, 4), (0xAC, ab, 4), (0xBC, abx, 4)):
+        reg(opc, cyc, reader(mode, ldy))
+    for opc, mode, cyc in ((0x85, zp, 3), (0x95, zpx, 4), (0x8D, ab, 4), (0x9D, abx, 5),
+                           (0x99, aby, 5), (0x81, izx, 6), (0x91, izy, 6)):
+        reg(opc, cyc, writer(mode, lambda: m.a))
+    for opc, mode, cyc in ((0x86, zp, 3), (0x96, zpy, 4), (0x8E, ab, 4)):
+        reg(opc, cyc, writer(mode, lambda: m.x))
+    for opc, mode, cyc in ((0x84, zp, 3), (0x94, zpx, 4), (0x8C, ab, 4)):
+        reg(opc, cyc, writer(mode, lambda: m.y))
+
+    # -- ALU --
+    def adc(v: int) -> None:
+        a, c = m.a, m.p & FLAG_C
+        if m.p & FLAG_D:
+            lo = (a & 0x0F) + (v & 0x0F) + c
+            if lo > 9:
+                lo += 6
+            hi = (a >> 4) + (v >> 4) + (1 if lo > 0x0F else 0)
+            bin_r = (a + v + c) & 0xFF
+            ovf = ~(a ^ v) & (a ^ (hi << 4)) & 0x80
+            if hi > 9:
+                hi += 6
+            r = ((hi << 4) | (lo & 0x0F)) & 0xFF
+            carry = hi > 0x0F
+            m.p = (m.p & ~(FLAG_C | FLAG_V)) | (FLAG_C if carry else 0) | (FLAG_V if ovf else 0)
+            m.a = r
+            m.p = (m.p & ~(FLAG_N | FLAG_Z)) | (r & FLAG_N) | (0 if bin_r else FLAG_Z)
+            return
+        total = a + v + c
+        r = total & 0xFF
+        ovf = ~(a ^ v) & (a ^ r) & 0x80
+        m.p = (m.p & ~(FLAG_C | FLAG_V)) | (FLAG_C if total > 0xFF else 0) | (FLAG_V if ovf else 0)
+        m.a = r
+        m._nz(r)
+
+    def sbc(v: int) -> None:
+        if m.p & FLAG_D:
+            a, borrow = m.a, 1 - (m.p & FLAG_C)
+            total = a - v - borrow
+            r = total & 0xFF
+            ovf = (a ^ v) & (a ^ r) & 0x80
+            lo = (a & 0x0F) - (v & 0x0F) - borrow
+            hi = (a >> 4) - (v >> 4)
+            if lo < 0:
+                lo -= 6
+                hi -= 1
+            if hi < 0:
+                hi -= 6
+            m.p = (m.p & ~(FLAG_C | FLAG_V)) | (FLAG_C if total >= 0 else 0) | (FLAG_V if ovf else 0)
+            m.a = ((hi << 4) | (lo & 0x0F)) & 0xFF
+            m._nz(r)
+            return
+        adc(v ^ 0xFF)
+
+    def and_(v: int) -> None:
+        m.a &= v
+        m._nz(m.a)
+
+    def ora(v: int) -> None:
+        m.a |= v
+        m._nz(m.a)
+
+    def eor(v: int) -> None:
+        m.a ^= v
+        m._nz(m.a)
+
+    def compare(r: int, v: int) -> None:
+        d = (r - v) & 0x1FF
+        m.p = (m.p & ~(FLAG_N | FLAG_Z | FLAG_C)) | (d & FLAG_N) | (0 if d & 0xFF else FLAG_Z) | (
+            FLAG_C if r >= v else 0
+        )
+
+    def cmp_(v: int) -> None:
+        compare(m.a, v)
+
+    def cpx(v: int) -> None:
+        compare(m.x, v)
+
+    def cpy(v: int) -> None:
+        compare(m.y, v)
+
+    def bit(v: int) -> None:
+        m.p = (m.p & ~(FLAG_N | FLAG_V | FLAG_Z)) | (v & (FLAG_N | FLAG_V)) | (0 if m.a & v else FLAG_Z)
+
+    group = ((0x69, 0x65, 0x75, 0x6D, 0x7D, 0x79, 0x61, 0x71), adc), \
+            ((0xE9, 0xE5, 0xF5, 0xED, 0xFD, 0xF9, 0xE1, 0xF1), sbc), \
+            ((0x29, 0x25, 0x35, 0x2D, 0x3D, 0x39, 0x21, 0x31), and_), \
+            ((0x09, 0x05, 0x15, 0x0D, 0x1D, 0x19, 0x01, 0x11), ora), \
+            ((0x49, 0x45, 0x55, 0x4D, 0x5D, 0x59, 0x41, 0x51), eor), \
+            ((0xC9, 0xC5, 0xD5, 0xCD, 0xDD, 0xD9, 0xC1, 0xD1), cmp_)
+    modes = ((imm, 2), (zp, 3), (zpx, 4), (ab, 4), (abx, 4), (aby, 4), (izx, 6), (izy, 5))
+    for opcodes, op in group:
+        for opc, (mode, cyc) in zip(opcodes, modes):
+            reg(opc, cyc, reader(mode, op))
+    for opc, mode, cyc in ((0xE0, imm, 2), (0xE4, zp, 3), (0xEC, ab, 4)):
+        reg(opc, cyc, reader(mode, cpx))
+    for opc, mode, cyc in ((0xC0, imm, 2), (0xC4, zp, 3), (0xCC, ab, 4)):
+        reg(opc, cyc, reader(mode, cpy))
+    reg(0x24, 3, reader(zp, bit))
+    reg(0x2C, 4, reader(ab, bit))
+
+    # -- shifts / inc / dec (memory and accumulator) --
+    def asl(v: int) -> int:
+        r = (v << 1) & 0xFF
+        m.p = (m.p & ~FLAG_C) | (FLAG_C if v & 0x80 else 0)
+        m._nz(r)
+        return r
+
+    def lsr(v: int) -> int:
+        r = v >> 1
+        m.p = (m.p & ~FLAG_C) | (v & FLAG_C)
+        m._nz(r)
+        return r
+
+    def rol(v: int) -> int:
+        r = ((v << 1) | (m.p & FLAG_C)) & 0xFF
+        m.p = (m.p & ~FLAG_C) | (FLAG_C if v & 0x80 else 0)
+        m._nz(r)
+        return r
+
+    def ror(v: int) -> int:
+        r = (v >> 1) | (0x80 if m.p & FLAG_C else 0)
+        m.p = (m.p & ~FLAG_C) | (v & FLAG_C)
+        m._nz(r)
+        return r
+
+    def inc(v: int) -> int:
+        r = (v + 1) & 0xFF
+        m._nz(r)
+        return r
+
+    def dec(v: int) -> int:
+        r = (v - 1) & 0xFF
+        m._nz(r)
+        return r
+
+    rmw_modes = ((zp, 5), (zpx, 6), (ab, 6), (abx, 7))
+    for opcodes, op in (((0x06, 0x16, 0x0E, 0x1E), asl), ((0x46, 0x56, 0x4E, 0x5E), lsr),
+                        ((0x26, 0x36, 0x2E, 0x3E), rol), ((0x66, 0x76, 0x6E, 0x7E), ror),
+                        ((0xE6, 0xF6, 0xEE, 0xFE), inc), ((0xC6, 0xD6, 0xCE, 0xDE), dec)):
+        for opc, (mode, cyc) in zip(opcodes, rmw_modes):
+            reg(opc, cyc, rmw(mode, op))
+
+    def acc(op):
+        def run() -> None:
+            m.a = op(m.a)
+        return run
+
+    reg(0x0A, 2, acc(asl))
+    reg(0x4A, 2, acc(lsr))
+    reg(0x2A, 2, acc(rol))
+    reg(0x6A, 2, acc(ror))
+
+    # -- register transfers / inc / dec --
+    def set_reg(name: str, src):
+        def run() -> None:
+            v = src() & 0xFF
+            setattr(m, name, v)
+            m._nz(v)
+        return run
+
+    reg(0xAA, 2, set_reg("x", lambda: m.a))        # TAX
+    reg(0xA8, 2, set_reg("y", lambda: m.a))        # TAY
+    reg(0x8A, 2, set_reg("a", lambda: m.x))        # TXA
+    reg(0x98, 2, set_reg("a", lambda: m.y))        # TYA
+    reg(0xBA, 2, set_reg("x", lambda: m.s))        # TSX
+    reg(0xE8, 2, set_reg("x", lambda: m.x + 1))    # INX
+    reg(0xC8, 2, set_reg("y", lambda: m.y + 1))    # INY
+    reg(0xCA, 2, set_reg("x", lambda: m.x - 1))    # DEX
+    reg(0x88, 2, set_reg("y", lambda: m.y - 1))    # DEY
+
+    def txs() -> None:
+        m.s = m.x
+
+    reg(0x9A, 2, txs)
+    reg(0xEA, 2, lambda: None)                     # NOP
+
+    # -- flags --
+    def set_flag(mask: int, on: bool):
+        def run() -> None:
+            m.p = (m.p | mask) if on else (m.p & ~mask)
+        return run
+
+    reg(0x18, 2, set_flag(FLAG_C, False))
+    reg(0x38, 2, set_flag(FLAG_C, True))
+    reg(0x58, 2, set_flag(FLAG_I, False))
+    reg(0x78, 2, set_flag(FLAG_I, True))
+    reg(0xB8, 2, set_flag(FLAG_V, False))
+    reg(0xD8, 2, set_flag(FLAG_D, False))
+    reg(0xF8, 2, set_flag(FLAG_D, True))
+
+    # -- stack --
+    def pha() -> None:
+        m._push(m.a)
+
+    def php() -> None:
+        m._push(m.p | FLAG_B | FLAG_U)
+
+    def pla() -> None:
+        m.a = m._pull()
+        m._nz(m.a)
+
+    def plp() -> None:
+        m.p = (m._pull() & ~FLAG_B) | FLAG_U
+
+    reg(0x48, 3, pha)
+    reg(0x08, 3, php)
+    reg(0x68, 4, pla)
+    reg(0x28, 4, plp)
+
+    # -- branches --
+    def branch(mask: int, want: bool):
+        def run() -> None:
+            off = fetch()
+            if bool(m.p & mask) == want:
+                target = (m.pc + (off - 0x100 if off & 0x80 else off)) & 0xFFFF
+                m.cycles += 2 if (target ^ m.pc) & 0xFF00 else 1
+                m.pc = target
+        return run
+
+    reg(0x10, 2, branch(FLAG_N, False))  # BPL
+    reg(0x30, 2, branch(FLAG_N, True))   # BMI
+    reg(0x50, 2, branch(FLAG_V, False))  # BVC
+    reg(0x70, 2, branch(FLAG_V, True))   # BVS
+    reg(0x90, 2, branch(FLAG_C, False))  # BCC
+    reg(0xB0, 2, branch(FLAG_C, True))   # BCS
+    reg(0xD0, 2, branch(FLAG_Z, False))  # BNE
+    reg(0xF0, 2, branch(FLAG_Z, True))   # BEQ
+
+    # -- jumps / subroutines --
+    def jmp() -> None:
+        m.pc = fetch_word()
+
+    def jmp_ind() -> None:
+        ptr = fetch_word()
+        # 6502 bug: the high byte is fetched from the same page.
+        m.pc = read(ptr) | (read((ptr & 0xFF00) | ((ptr + 1) & 0xFF)) << 8)
+
+    def jsr() -> None:
+        target = fetch_word()
+        ret = (m.pc - 1) & 0xFFFF
+        m._push(ret >> 8)
+        m._push(ret & 0xFF)
+        m.pc = target
+
+    def rts() -> None:
+        lo = m._pull()
+        m.pc = ((lo | (m._pull() << 8)) + 1) & 0xFFFF
+
+    def rti() -> None:
+        plp()
+        lo = m._pull()
+        m.pc = lo | (m._pull() << 8)
+
+    def brk() -> None:
+        ret = (m.pc + 1) & 0xFFFF
+        m._push(ret >> 8)
+        m._push(ret & 0xFF)
+        m._push(m.p | FLAG_B | FLAG_U)
+        m.p |= FLAG_I
+        m.pc = read(0xFFFE) | (read(0xFFFF) << 8)
+
+    reg(0x4C, 3, jmp)
+    reg(0x6C, 5, jmp_ind)
+    reg(0x20, 6, jsr)
+    reg(0x60, 6, rts)
+    reg(0x40, 6, rti)
+    reg(0x00, 7, brk)
+
+    return ops